@@ -1,12 +1,134 @@
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from lxml import etree
+import tldextract
 import os
+import shutil
 import urllib.parse
 import time
 import re
 import json
-from urllib.parse import urlparse
+import codecs
+import sqlite3
+from urllib.parse import urlparse, urlunparse
 import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
+from collections import deque
+from functools import lru_cache
+
+# Content-Disposition filename pattern, compiled once
+_CD_FILENAME_RE = re.compile(r'filename="?([^"]+)"?')
+
+# Splits host names on the bundled Public Suffix List, without network access
+_DOMAIN_EXTRACTOR = tldextract.TLDExtract(suffix_list_urls=())
+
+# Content types that don't say whether the body is a PDF
+_GENERIC_CONTENT_TYPES = {
+    '', 'application/octet-stream', 'binary/octet-stream',
+    'application/download', 'application/force-download'
+}
+
+# Characters not allowed in file and folder names
+_SANITIZE_TABLE = str.maketrans({c: '_' for c in '\\/*?:"<>|'})
+
+# Common non-content links that are never followed
+_SKIP_RE = re.compile(
+    r'mailto:|tel:|javascript:|#|/login|/logout|/register|/search|'
+    r'facebook\.com|twitter\.com|youtube\.com|instagram\.com',
+    re.IGNORECASE
+)
+
+@lru_cache(maxsize=16384)
+def _netloc(url):
+    """Return the network location of a URL, cached for repeated links"""
+    return urlparse(url).netloc
+
+def _canonical_url(url):
+    """Normalize a URL so the same file linked from different pages matches"""
+    parsed = urlparse(url)
+    return urlunparse(parsed._replace(fragment='', netloc=parsed.netloc.lower()))
+
+def is_pdf_link(url, text=None):
+    """Check if a URL likely points to a PDF"""
+    # Check URL extension or URL contains pdf
+    url = url.lower()
+    if url.endswith('.pdf') or 'pdf' in url:
+        return True
+    
+    # Check if link text suggests it's a PDF
+    if text:
+        text = text.lower()
+        return text.endswith('.pdf') or 'pdf' in text
+    
+    # TODO: Could add more sophisticated checks here
+    
+    return False
+
+class RateLimiter:
+    """Limit how often the same host is hit, shared across threads"""
+    def __init__(self, max_per_sec):
+        self.interval = 1.0 / max_per_sec
+        self.next_slot = {}
+        self.lock = threading.Lock()
+    
+    def wait(self, url):
+        """Block until a request to the URL's host is allowed"""
+        host = _netloc(url)
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot.get(host, now))
+            self.next_slot[host] = slot + self.interval
+        
+        if slot > now:
+            time.sleep(slot - now)
+
+class CrawlState:
+    """Pages fetched by earlier runs, kept in SQLite so crawls can resume"""
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS visited('
+            'url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, links TEXT)'
+        )
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS downloaded_files(url TEXT PRIMARY KEY, path TEXT)'
+        )
+    
+    def get_page(self, url):
+        """Return (etag, last_modified, links) stored for a page, or None"""
+        row = self.conn.execute(
+            'SELECT etag, last_modified, links FROM visited WHERE url = ?', (url,)
+        ).fetchone()
+        if row is None:
+            return None
+        
+        etag, last_modified, links = row
+        return etag, last_modified, [tuple(link) for link in json.loads(links)]
+    
+    def save_page(self, url, etag, last_modified, links):
+        """Store a page's validators and links for the next run"""
+        with self.conn:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO visited VALUES (?, ?, ?, ?)',
+                (url, etag, last_modified, json.dumps(links))
+            )
+    
+    def get_downloaded(self):
+        """Return the canonical URLs of downloaded PDFs whose files are still on disk"""
+        rows = self.conn.execute('SELECT url, path FROM downloaded_files')
+        return {url for url, path in rows if os.path.exists(path)}
+    
+    def save_downloaded(self, files):
+        """Record (canonical URL, file path) pairs of newly downloaded PDFs"""
+        with self.conn:
+            self.conn.executemany('INSERT OR REPLACE INTO downloaded_files VALUES (?, ?)', files)
+    
+    def close(self):
+        self.conn.close()
 
 class FlexiblePDFScraper:
     def __init__(self, config=None):
@@ -21,23 +143,101 @@ class FlexiblePDFScraper:
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
         
+        # Reuse pooled keep-alive connections across all requests
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        
+        # Opened by start_scraping
+        self.crawl_state = None
+        
+        # Download worker count the session's connection pool is sized for
+        self.workers = None
+        
         # Set default values if not provided
+        self.apply_config()
+        
+        # Canonical URLs of PDFs already downloaded, across pages and runs
+        self.downloaded_pdfs = set()
+        
+        # Canonical URLs of links found not to be PDFs in this process
+        self.non_pdf_urls = set()
+        
+        # Folders already created by this process
+        self.created_folders = set()
+        
+        # File paths taken by downloads in this process, shared by the workers
+        self.claimed_paths = set()
+        self.claimed_paths_lock = threading.Lock()
+        
+        # Create download folder
+        self.ensure_folder(self.download_folder)
+    
+    def apply_config(self):
+        """Read settings from self.config and compile the link filters"""
         self.base_url = self.config.get('base_url', '')
+        self.base_netloc = _netloc(self.base_url)
         self.download_folder = self.config.get('download_folder', 'downloaded_pdfs')
         
-        # Create download folder
-        if not os.path.exists(self.download_folder):
-            os.makedirs(self.download_folder)
+        follow_pattern = self.config.get('follow_pattern')
+        self.follow_re = re.compile(follow_pattern, re.IGNORECASE) if follow_pattern else None
+        
+        ignore_pattern = self.config.get('ignore_pattern')
+        self.ignore_re = re.compile(ignore_pattern, re.IGNORECASE) if ignore_pattern else None
+        
+        # The link filter only changes with the config, so bind it once here
+        self.should_follow_link = self.compile_should_follow()
+        
+        # Space out requests to the same host
+        self.rate_limiter = RateLimiter(self.config.get('max_per_sec', 5))
+        
+        # Keep one pooled connection per download worker plus one for page
+        # fetches, so parallel downloads never open and drop extra connections
+        workers = self.config.get('workers', 8)
+        if workers != self.workers:
+            self.workers = workers
+            adapter = HTTPAdapter(
+                pool_connections=16,
+                pool_maxsize=self.workers + 1,
+                max_retries=Retry(total=3, backoff_factor=0.3)
+            )
+            for prefix in ('http://', 'https://'):
+                # Close the replaced adapter's pooled connections right away
+                self.session.adapters[prefix].close()
+                self.session.mount(prefix, adapter)
+    
+    def ensure_folder(self, path):
+        """Create a folder if needed, at most once per process"""
+        if path in self.created_folders:
+            return
+        os.makedirs(path, exist_ok=True)
+        self.created_folders.add(path)
+    
+    def claim_path(self, folder, filename):
+        """Reserve a free file path for a download, as 'name (2).pdf' etc. if taken"""
+        name, ext = os.path.splitext(filename)
+        filepath = os.path.join(folder, filename)
+        with self.claimed_paths_lock:
+            # Files left by earlier runs count as taken too
+            copy_number = 2
+            while filepath in self.claimed_paths or os.path.exists(filepath):
+                filepath = os.path.join(folder, f"{name} ({copy_number}){ext}")
+                copy_number += 1
+            self.claimed_paths.add(filepath)
+        return filepath
     
     def extract_domain(self, url):
         """Extract domain name from URL for naming"""
-        parsed_url = urlparse(url)
-        domain = parsed_url.netloc
-        # Remove www. if present
-        domain = re.sub(r'^www\.', '', domain)
-        # Remove .rs, .gov, etc.
-        domain = re.sub(r'\.[a-z]+$', '', domain)
-        return domain
+        parts = _DOMAIN_EXTRACTOR(url)
+        
+        # Remove www. if present, whether it is a subdomain or the domain label
+        labels = [label for label in parts.subdomain.split('.') if label]
+        if labels and labels[0].lower() == 'www':
+            labels = labels[1:]
+        if parts.domain and parts.domain.lower() != 'www':
+            labels.append(parts.domain)
+        
+        # Remove .rs, .gov.rs, .co.uk, etc., unless nothing else is left
+        return '.'.join(labels) or parts.suffix or parts.domain
     
     def save_config(self, filename=None):
         """Save the current configuration to a file"""
@@ -55,76 +255,118 @@ class FlexiblePDFScraper:
         try:
             with open(filename, 'r', encoding='utf-8') as f:
                 self.config = json.load(f)
-                self.base_url = self.config.get('base_url', '')
-                self.download_folder = self.config.get('download_folder', 'downloaded_pdfs')
+            self.apply_config()
             print(f"Configuration loaded from {filename}")
             return True
         except Exception as e:
             print(f"Error loading configuration: {e}")
             return False
     
+    def head_content_type(self, url):
+        """Return the Content-Type reported by a HEAD request, or None if it fails"""
+        try:
+            self.rate_limiter.wait(url)
+            response = self.session.head(url, allow_redirects=True, timeout=5)
+            if response.ok:
+                return response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+        except requests.RequestException:
+            pass
+        return None
+    
     def download_file(self, url, folder, filename=None):
-        """Download a file from URL to the specified folder"""
+        """
+        Download a file from URL to the specified folder
+        
+        Returns:
+            str: Path of the saved file, or False if nothing was saved
+        """
+        filepath = None
         try:
-            response = requests.get(url, headers=self.headers, stream=True)
-            response.raise_for_status()
+            # Links that only mention "pdf" are often HTML pages, so check
+            # what the server reports before downloading them
+            sniff = False
+            if not urlparse(url).path.lower().endswith('.pdf'):
+                content_type = self.head_content_type(url)
+                if content_type is None or content_type in _GENERIC_CONTENT_TYPES:
+                    sniff = True
+                elif 'pdf' not in content_type:
+                    print(f"Skipping {url}: not a PDF ({content_type})")
+                    self.non_pdf_urls.add(_canonical_url(url))
+                    return False
             
-            # Generate filename if not provided
-            if not filename:
-                # Try to get from Content-Disposition header
-                if "Content-Disposition" in response.headers:
-                    content_disposition = response.headers["Content-Disposition"]
-                    filename_match = re.search(r'filename="?([^"]+)"?', content_disposition)
-                    if filename_match:
-                        filename = filename_match.group(1)
+            self.rate_limiter.wait(url)
+            with self.session.get(url, stream=True) as response:
+                response.raise_for_status()
+                
+                # Let urllib3 undo any gzip/deflate on the raw stream
+                response.raw.decode_content = True
                 
-                # If still not found, extract from URL
+                # Without a usable Content-Type, check the PDF signature
+                first_bytes = b''
+                if sniff:
+                    first_bytes = response.raw.read(5)
+                    if first_bytes != b'%PDF-':
+                        print(f"Skipping {url}: not a PDF")
+                        self.non_pdf_urls.add(_canonical_url(url))
+                        return False
+                
+                # Generate filename if not provided
                 if not filename:
-                    filename = os.path.basename(urllib.parse.urlparse(url).path)
+                    # Try to get from Content-Disposition header
+                    if "Content-Disposition" in response.headers:
+                        content_disposition = response.headers["Content-Disposition"]
+                        filename_match = _CD_FILENAME_RE.search(content_disposition)
+                        if filename_match:
+                            filename = filename_match.group(1)
+                    
+                    # If still not found, extract from URL
+                    if not filename:
+                        filename = os.path.basename(urllib.parse.urlparse(url).path)
+                    
+                    # Clean up filename
+                    filename = filename.replace('%20', ' ')
+                    # Remove invalid characters
+                    filename = filename.translate(_SANITIZE_TABLE)
+                    # Add .pdf extension if not present and it's a PDF
+                    content_type = response.headers.get('Content-Type', '').lower()
+                    if 'application/pdf' in content_type and not filename.lower().endswith('.pdf'):
+                        filename += '.pdf'
                 
-                # Clean up filename
-                filename = filename.replace('%20', ' ')
-                # Remove invalid characters
-                filename = re.sub(r'[\\/*?:"<>|]', '_', filename)
-                # Add .pdf extension if not present and it's a PDF
-                content_type = response.headers.get('Content-Type', '').lower()
-                if 'application/pdf' in content_type and not filename.lower().endswith('.pdf'):
-                    filename += '.pdf'
-            
-            # Ensure the filename is valid and unique
-            if not filename or filename == '':
-                timestamp = int(time.time())
-                filename = f"document_{timestamp}.pdf"
-            
-            # Save the file
-            filepath = os.path.join(folder, filename)
-            with open(filepath, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
-            
-            print(f"Downloaded: {filename}")
-            return True
+                # Ensure the filename is valid and unique
+                if not filename or filename == '':
+                    timestamp = int(time.time())
+                    filename = f"document_{timestamp}.pdf"
+                
+                # Save the file; downloads may share a name, so claim a free
+                # path only now that the PDF is known to be worth writing
+                filepath = self.claim_path(folder, filename)
+                filename = os.path.basename(filepath)
+                with open(filepath, 'wb') as f:
+                    # Copy in 1 MiB blocks
+                    f.write(first_bytes)
+                    shutil.copyfileobj(response.raw, f, length=1 << 20)
+                
+                print(f"Downloaded: {filename}")
+                return filepath
         except Exception as e:
             print(f"Failed to download {url}: {e}")
+            # Don't leave a partial file behind, and give its name back
+            if filepath:
+                if os.path.exists(filepath):
+                    os.remove(filepath)
+                with self.claimed_paths_lock:
+                    self.claimed_paths.discard(filepath)
             return False
     
-    def is_pdf_link(self, url, text=None):
-        """Check if a URL likely points to a PDF"""
-        # Check URL extension
-        if url.lower().endswith('.pdf'):
-            return True
-        
-        # Check URL contains pdf
-        if 'pdf' in url.lower():
-            return True
-        
-        # Check if link text suggests it's a PDF
-        if text and ('pdf' in text.lower() or text.lower().endswith('.pdf')):
-            return True
-        
-        # TODO: Could add more sophisticated checks here
-        
-        return False
+    def close(self):
+        """Close the HTTP session and the crawl state database"""
+        self.session.close()
+        if self.crawl_state:
+            self.crawl_state.close()
+            self.crawl_state = None
+    
+    # Kept on the class for existing callers
+    is_pdf_link = staticmethod(is_pdf_link)
     
     def interactive_setup(self):
         """Set up scraper configuration interactively"""
@@ -145,8 +387,7 @@ class FlexiblePDFScraper:
         self.download_folder = folder_input if folder_input else default_folder
         
         # Create the folder
-        if not os.path.exists(self.download_folder):
-            os.makedirs(self.download_folder)
+        self.ensure_folder(self.download_folder)
         
         # Scraping mode
         print("\nSelect scraping mode:")
@@ -179,6 +420,12 @@ class FlexiblePDFScraper:
         else:
             self.config['navigation_mode'] = False
         
+        try:
+            self.apply_config()
+        except re.error as e:
+            print(f"Error: Invalid link pattern: {e}")
+            return False
+        
         # Save config
         save_config = input("Save this configuration for future use? (y/n): ").strip().lower()
         if save_config == 'y':
@@ -186,168 +433,244 @@ class FlexiblePDFScraper:
         
         return True
     
-    def scrape_single_page(self, url, folder=None):
-        """Scrape a single page for PDF links"""
-        if folder is None:
-            folder = self.download_folder
-        
-        if not os.path.exists(folder):
-            os.makedirs(folder)
-        
-        print(f"Scraping {url} for PDFs...")
+    def fetch_links(self, url):
+        """
+        Fetch a page and return its links as (absolute URL, link text) pairs
         
-        try:
-            response = requests.get(url, headers=self.headers)
+        Returns:
+            tuple: (links, validators) where validators is (etag, last_modified)
+            for a freshly fetched page, or None if the page is unchanged since
+            the last run and its stored links were reused
+        """
+        # Ask the server to skip the body if the page hasn't changed
+        cached = self.crawl_state.get_page(url) if self.crawl_state else None
+        headers = {}
+        if cached:
+            etag, last_modified, cached_links = cached
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+        
+        self.rate_limiter.wait(url)
+        with self.session.get(url, headers=headers, stream=True) as response:
+            if response.status_code == 304 and cached:
+                return cached_links, None
             response.raise_for_status()
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            # Parse straight from the (decompressed) socket stream instead of
+            # loading the whole page into memory first
+            response.raw.decode_content = True
             
-            # Find all links
-            links = soup.find_all('a')
+            # lxml only looks at <meta charset>, so pass on a charset declared
+            # in the HTTP headers (but not requests' ISO-8859-1 default)
+            encoding = None
+            if 'charset' in response.headers.get('Content-Type', '').lower():
+                encoding = requests.utils.get_encoding_from_headers(response.headers)
+                # Let lxml detect it instead if Python doesn't know the charset
+                try:
+                    codecs.lookup(encoding)
+                except LookupError:
+                    encoding = None
             
-            pdf_count = 0
-            for link in links:
-                href = link.get('href')
-                if not href:
+            # Menus and sitemaps repeat the same links many times; keep one
+            # copy of each (URL, text) pair so it is only classified once
+            links = []
+            seen = set()
+            anchors = etree.iterparse(
+                response.raw, events=('end',), tag='a', html=True, encoding=encoding
+            )
+            try:
+                for event, element in anchors:
+                    href = (element.get('href') or '').strip()
+                    if href:
+                        # Convert to absolute URL if needed
+                        link = (urllib.parse.urljoin(url, href), ''.join(element.itertext()))
+                        if link not in seen:
+                            seen.add(link)
+                            links.append(link)
+                    
+                    # Free anchors already seen, along with everything before them
+                    element.clear()
+                    while element.getprevious() is not None:
+                        del element.getparent()[0]
+            except etree.XMLSyntaxError:
+                # An empty body has no document at all; treat it as a page
+                # without links rather than a failed one
+                if links:
+                    raise
+            
+            return links, (response.headers.get('ETag'), response.headers.get('Last-Modified'))
+    
+    def download_pdfs(self, links, folder):
+        """Download every PDF link from a list of (URL, link text) pairs"""
+        pdf_urls = []
+        canonical_urls = []
+        filenames = []
+        for full_url, text in links:
+            # Check if it's a PDF link
+            if is_pdf_link(full_url, text):
+                # Skip PDFs already fetched from another page or an earlier run,
+                # and links already found not to be PDFs
+                canonical = _canonical_url(full_url)
+                if canonical in self.downloaded_pdfs or canonical in self.non_pdf_urls:
                     continue
+                self.downloaded_pdfs.add(canonical)
                 
-                # Convert to absolute URL if needed
-                full_url = urllib.parse.urljoin(url, href)
+                # Get text for filename
+                link_text = text.strip()
+                filename = None
+                if link_text:
+                    # Clean up the text for filename
+                    filename = link_text.translate(_SANITIZE_TABLE)
+                    if not filename.lower().endswith('.pdf'):
+                        filename += '.pdf'
                 
-                # Check if it's a PDF link
-                if self.is_pdf_link(full_url, link.text):
-                    # Get text for filename
-                    link_text = link.text.strip()
-                    filename = None
-                    if link_text:
-                        # Clean up the text for filename
-                        filename = re.sub(r'[\\/*?:"<>|]', '_', link_text)
-                        if not filename.lower().endswith('.pdf'):
-                            filename += '.pdf'
-                    
-                    # Download the PDF
-                    success = self.download_file(full_url, folder, filename)
-                    if success:
-                        pdf_count += 1
-                    
-                    # Add a small delay
-                    time.sleep(0.5)
-            
-            print(f"Found {pdf_count} PDFs on this page")
+                pdf_urls.append(full_url)
+                canonical_urls.append(canonical)
+                filenames.append(filename)
+        
+        # Download the PDFs in parallel over the shared session
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            results = list(executor.map(self.download_file, pdf_urls, repeat(folder), filenames))
+        
+        # Failed downloads may be retried from another page
+        downloaded = []
+        for canonical, filepath in zip(canonical_urls, results):
+            if filepath:
+                downloaded.append((canonical, os.path.abspath(filepath)))
+            else:
+                self.downloaded_pdfs.discard(canonical)
+        
+        if self.crawl_state:
+            self.crawl_state.save_downloaded(downloaded)
+        
+        pdf_count = len(downloaded)
+        print(f"Found {pdf_count} PDFs on this page")
+        return pdf_count
+    
+    def scrape_page(self, url, folder):
+        """Download the PDFs on a page and return (PDF count, links)"""
+        print(f"Scraping {url} for PDFs...")
+        
+        links, validators = self.fetch_links(url)
+        
+        # PDFs finished in earlier runs are skipped by download_pdfs, so an
+        # unchanged page only retries the ones that failed last time
+        if validators is None:
+            print("Page unchanged since last run, retrying only missing PDFs")
+        
+        pdf_count = self.download_pdfs(links, folder)
+        
+        # Remember the page only once its PDFs have been attempted
+        if self.crawl_state and validators is not None:
+            self.crawl_state.save_page(url, *validators, links)
+        
+        return pdf_count, links
+    
+    def scrape_single_page(self, url, folder=None):
+        """Scrape a single page for PDF links"""
+        if folder is None:
+            folder = self.download_folder
+        
+        self.ensure_folder(folder)
+        
+        try:
+            pdf_count, links = self.scrape_page(url, folder)
             return pdf_count
         
         except Exception as e:
             print(f"Error scraping {url}: {e}")
             return 0
     
-    def should_follow_link(self, url, link_text):
-        """Determine if a link should be followed based on configuration"""
-        # Skip if it's a PDF link
-        if self.is_pdf_link(url, link_text):
-            return False
-        
-        # Skip common non-content links
-        skip_patterns = [
-            r'mailto:', r'tel:', r'javascript:', r'#',
-            r'/login', r'/logout', r'/register', r'/search',
-            r'facebook.com', r'twitter.com', r'youtube.com', r'instagram.com'
-        ]
-        
-        for pattern in skip_patterns:
-            if re.search(pattern, url, re.IGNORECASE):
+    def compile_should_follow(self):
+        """Build should_follow_link with the current config bound as local variables"""
+        skip_search = _SKIP_RE.search
+        follow_search = self.follow_re.search if self.follow_re else None
+        ignore_search = self.ignore_re.search if self.ignore_re else None
+        base_netloc = self.base_netloc
+        
+        def should_follow_link(url, link_text):
+            """Determine if a link should be followed based on configuration"""
+            # Skip if it's a PDF link
+            if is_pdf_link(url, link_text):
                 return False
-        
-        # Check custom follow pattern if configured
-        if 'follow_pattern' in self.config and self.config['follow_pattern']:
-            if not re.search(self.config['follow_pattern'], url, re.IGNORECASE) and \
-               not re.search(self.config['follow_pattern'], link_text, re.IGNORECASE):
+            
+            # Skip common non-content links
+            if skip_search(url):
                 return False
-        
-        # Check custom ignore pattern if configured
-        if 'ignore_pattern' in self.config and self.config['ignore_pattern']:
-            if re.search(self.config['ignore_pattern'], url, re.IGNORECASE) or \
-               re.search(self.config['ignore_pattern'], link_text, re.IGNORECASE):
+            
+            # Check custom follow pattern if configured
+            if follow_search is not None:
+                if not follow_search(url) and not follow_search(link_text):
+                    return False
+            
+            # Check custom ignore pattern if configured
+            if ignore_search is not None:
+                if ignore_search(url) or ignore_search(link_text):
+                    return False
+            
+            # Ensure we stay on the same domain
+            link_domain = _netloc(url)
+            
+            if link_domain and link_domain != base_netloc:
                 return False
+            
+            return True
         
-        # Ensure we stay on the same domain
-        base_domain = urlparse(self.base_url).netloc
-        link_domain = urlparse(url).netloc
-        
-        if link_domain and link_domain != base_domain:
-            return False
-        
-        return True
+        return should_follow_link
     
-    def scrape_with_navigation(self, start_url=None, max_depth=None, visited=None, current_depth=0):
-        """Scrape PDFs with navigation through links"""
+    def scrape_with_navigation(self, start_url=None, max_depth=None):
+        """Scrape PDFs with navigation through links, breadth-first"""
         if start_url is None:
             start_url = self.base_url
         
         if max_depth is None:
             max_depth = self.config.get('max_depth', 2)
         
-        if visited is None:
-            visited = set()
-        
-        if current_depth > max_depth:
-            return 0
-        
-        if start_url in visited:
-            return 0
-        
-        visited.add(start_url)
+        # Pages waiting to be scraped with their depth, and every page queued so far
+        frontier = deque([(start_url, 0)])
+        visited = {start_url}
         
-        print(f"{'  ' * current_depth}Navigating to: {start_url} (Depth: {current_depth}/{max_depth})")
-        
-        try:
-            # Create a subfolder for this page if needed
-            if current_depth > 0:
-                path_parts = urlparse(start_url).path.strip('/').split('/')
-                if path_parts and path_parts[-1]:
-                    subfolder_name = re.sub(r'[\\/*?:"<>|]', '_', path_parts[-1])
-                    subfolder = os.path.join(self.download_folder, subfolder_name)
-                else:
-                    timestamp = int(time.time())
-                    subfolder = os.path.join(self.download_folder, f"page_{timestamp}")
-            else:
-                subfolder = self.download_folder
-            
-            if not os.path.exists(subfolder):
-                os.makedirs(subfolder)
-            
-            # First, download PDFs from this page
-            pdf_count = self.scrape_single_page(start_url, subfolder)
+        pdf_count = 0
+        while frontier:
+            url, depth = frontier.popleft()
             
-            # If at max depth, don't go further
-            if current_depth >= max_depth:
-                return pdf_count
+            print(f"{'  ' * depth}Navigating to: {url} (Depth: {depth}/{max_depth})")
             
-            # Then, find links to follow
-            response = requests.get(start_url, headers=self.headers)
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            links = soup.find_all('a')
-            
-            for link in links:
-                href = link.get('href')
-                if not href:
-                    continue
+            try:
+                # Create a subfolder for this page if needed
+                if depth > 0:
+                    path_parts = urlparse(url).path.strip('/').split('/')
+                    if path_parts and path_parts[-1]:
+                        subfolder_name = path_parts[-1].translate(_SANITIZE_TABLE)
+                        subfolder = os.path.join(self.download_folder, subfolder_name)
+                    else:
+                        timestamp = int(time.time())
+                        subfolder = os.path.join(self.download_folder, f"page_{timestamp}")
+                else:
+                    subfolder = self.download_folder
                 
-                # Convert to absolute URL
-                full_url = urllib.parse.urljoin(start_url, href)
+                self.ensure_folder(subfolder)
                 
-                # Check if we should follow this link
-                if self.should_follow_link(full_url, link.text):
-                    # Recursively scrape the linked page
-                    pdf_count += self.scrape_with_navigation(
-                        full_url, max_depth, visited, current_depth + 1
-                    )
+                # First, download PDFs from this page
+                page_pdf_count, links = self.scrape_page(url, subfolder)
+                pdf_count += page_pdf_count
+                
+                # If at max depth, don't go further
+                if depth >= max_depth:
+                    continue
+                
+                # Then, queue links to other pages one level deeper
+                for full_url, text in links:
+                    if full_url not in visited and self.should_follow_link(full_url, text):
+                        visited.add(full_url)
+                        frontier.append((full_url, depth + 1))
             
-            return pdf_count
+            except Exception as e:
+                print(f"{'  ' * depth}Error navigating {url}: {e}")
         
-        except Exception as e:
-            print(f"{'  ' * current_depth}Error navigating {start_url}: {e}")
-            return 0
+        return pdf_count
     
     def start_scraping(self):
         """Start the scraping process based on configuration"""
@@ -356,6 +679,12 @@ class FlexiblePDFScraper:
         
         start_time = time.time()
         
+        # Remember fetched pages so repeated runs only reprocess changed ones
+        self.ensure_folder(self.download_folder)
+        crawl_db = self.config.get('crawl_db', os.path.join(self.download_folder, 'crawl.db'))
+        self.crawl_state = CrawlState(crawl_db)
+        self.downloaded_pdfs |= self.crawl_state.get_downloaded()
+        
         if self.config.get('navigation_mode', False):
             print("Using navigation mode...")
             total_pdfs = self.scrape_with_navigation()
@@ -369,6 +698,8 @@ class FlexiblePDFScraper:
         print(f"\nScraping complete!")
         print(f"Total PDFs downloaded: {total_pdfs}")
         print(f"Time taken: {duration:.2f} seconds")
+        
+        self.close()
 
 def list_saved_configs():
     """List all saved configurations in the current directory"""
@@ -407,8 +738,7 @@ def main():
             'download_folder': scraper.extract_domain(args.url) + '_pdfs',
             'navigation_mode': False
         }
-        scraper.base_url = args.url
-        scraper.download_folder = scraper.config['download_folder']
+        scraper.apply_config()
         scraper.start_scraping()
     else:
         # Interactive mode
@@ -442,8 +772,7 @@ def main():
                     'download_folder': scraper.extract_domain(url) + '_pdfs',
                     'navigation_mode': False
                 }
-                scraper.base_url = url
-                scraper.download_folder = scraper.config['download_folder']
+                scraper.apply_config()
                 scraper.start_scraping()
             else:
                 print("URL is required for quick scrape.")